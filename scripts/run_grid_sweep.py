@@ -7,8 +7,9 @@ using a depolarising error rate ``p_phys`` together with a biased bit-flip
 channel.  The bias factor is defined as ``beta = kappa2 / 50e3`` (where
 ``kappa2`` is given in Hz).  Measurement bit-flip errors are applied with
 probability ``p_phys / beta``.  Results from a parameter sweep are written to
-``results/epsilon_log.csv`` and an accompanying scatter plot is saved to
-``results/grid_sweep.png``.
+``results/epsilon_log.csv``.  When ``--show-plot`` is passed (or the
+``WAVEGUIDE_PLOT`` environment variable is set) an accompanying scatter plot
+is saved to ``results/grid_sweep.png``.
 
 Example
 -------
@@ -20,17 +21,138 @@ Run with default settings::
 from __future__ import annotations
 
 import argparse
+import csv
+import functools
+import itertools
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Callable, Iterable, Sequence
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import pymatching as pm
 import stim
 
 
-def logical_error_rate(N_r: int, kappa2_hz: float, shots: int, p_phys: float = 1e-3) -> float:
+# Shots are drawn in blocks of this size so easy grid points can stop early.
+_BLOCK_SHOTS = 1024
+
+# Spacing between the derived seeds of consecutive grid points, leaving room
+# for one seed per worker thread within each point.
+_SEED_STRIDE = 1 << 20
+
+
+def _wilson_halfwidth(failures: int, shots: int, z: float = 1.96) -> float:
+    """Return the half-width of the Wilson score interval for ``failures/shots``."""
+    p = failures / shots
+    denom = 1.0 + z * z / shots
+    return z * math.sqrt(p * (1.0 - p) / shots + z * z / (4.0 * shots * shots)) / denom
+
+
+def _count_failures_single(preds: np.ndarray, obs: np.ndarray) -> int:
+    """Count differing shots when there is exactly one logical observable.
+
+    With a single observable the packed arrays are one byte per shot, so
+    the comparison collapses to a flat XOR and count with no shape checks
+    or axis reductions.
+    """
+    return int(np.count_nonzero(preds.ravel() ^ obs.ravel()))
+
+
+def _count_failures(preds: np.ndarray, obs: np.ndarray) -> int:
+    """Count shots whose predicted observables differ from the sampled ones.
+
+    Works on bit-packed or byte-per-bit arrays alike: the comparison is a
+    bitwise XOR, which avoids the slower ``!=`` ufunc path and the boolean
+    temporary it allocates.
+    """
+    if preds.dtype == np.bool_:
+        preds = preds.view(np.uint8)
+    if obs.dtype == np.bool_:
+        obs = obs.view(np.uint8)
+    if preds.shape[1] == 1:
+        # Single observable (the memory experiment): skip the axis=1 reduction.
+        return int(np.count_nonzero(preds[:, 0] ^ obs[:, 0]))
+    diff = np.bitwise_xor(preds, obs)
+    if diff.dtype == np.uint8 and diff.shape[1] >= 8:
+        # Wide packed rows: pad to a multiple of 8 bytes and OR-reduce in
+        # uint64 lanes, processing 64 observable bits per instruction.
+        pad = -diff.shape[1] % 8
+        if pad:
+            diff = np.pad(diff, ((0, 0), (0, pad)))
+        lanes = np.ascontiguousarray(diff).view(np.uint64)
+        return int(np.count_nonzero(np.bitwise_or.reduce(lanes, axis=1)))
+    return int(np.count_nonzero(diff.any(axis=1)))
+
+
+# Placeholder flip probability used when templating circuits.  The value is
+# exactly representable, so Stim prints it back verbatim and it can be
+# substituted textually without any float round-tripping.
+_MEAS_FLIP_SENTINEL = 0.25
+
+
+@functools.lru_cache(maxsize=None)
+def _circuit_template(N_r: int, p_phys: float) -> str:
+    """Return the circuit text for ``N_r`` rounds with a sentinel flip rate.
+
+    Only the measurement bit-flip probability varies with ``kappa2``, so the
+    circuit is generated once per ``N_r`` and the ``X_ERROR``/``Z_ERROR``
+    arguments are rewritten per grid point.
+    """
+    return str(
+        stim.Circuit.generated(
+            "surface_code:rotated_memory_x",
+            distance=3,
+            rounds=N_r,
+            after_clifford_depolarization=p_phys,
+            before_measure_flip_probability=_MEAS_FLIP_SENTINEL,
+        )
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _build(N_r: int, kappa2_hz: float, p_phys: float) -> tuple[stim.Circuit, pm.Matching]:
+    """Build the circuit and matching graph for one grid point.
+
+    Circuit generation, DEM decomposition and the PyMatching graph build
+    are independent of the shot count, so they are cached and shared by
+    repeated calls with the same parameters.  Samplers are compiled per
+    call because each worker thread needs its own seeded sampler.
+    """
+    beta = kappa2_hz / 50_000.0
+    meas_flip = p_phys / beta
+    text = re.sub(
+        rf"(X_ERROR|Z_ERROR)\({re.escape(str(_MEAS_FLIP_SENTINEL))}\)",
+        lambda m: f"{m.group(1)}({meas_flip!r})",
+        _circuit_template(N_r, p_phys),
+    )
+    circuit = stim.Circuit(text)
+    dem = circuit.detector_error_model(decompose_errors=True)
+    matching = pm.Matching.from_detector_error_model(dem)
+    return circuit, matching
+
+
+def _sample_block(
+    sampler: stim.CompiledDetectorSampler,
+    matching: pm.Matching,
+    block: int,
+    count: Callable[[np.ndarray, np.ndarray], int] = _count_failures,
+) -> int:
+    """Sample ``block`` shots, decode them and return the failure count.
+
+    Stim's sampler and PyMatching's batch decoder both release the GIL,
+    so blocks can run concurrently on worker threads.
+    """
+    dets, obs = sampler.sample(shots=block, separate_observables=True, bit_packed=True)
+    preds = matching.decode_batch(dets, bit_packed_shots=True, bit_packed_predictions=True)
+    return count(preds, obs)
+
+
+def logical_error_rate(
+    N_r: int, kappa2_hz: float, shots: int, p_phys: float = 1e-3, seed: int | None = None
+) -> float:
     """Estimate the logical error rate for a biased surface-code instance.
 
     Parameters
@@ -40,36 +162,86 @@ def logical_error_rate(N_r: int, kappa2_hz: float, shots: int, p_phys: float = 1
     kappa2_hz
         Cat-pump strength in Hz controlling the bias factor ``beta``.
     shots
-        Number of Monte-Carlo samples to draw from the circuit.
+        Maximum number of Monte-Carlo samples to draw from the circuit.
+        Sampling proceeds in blocks and stops early once the Wilson 95%
+        confidence interval is tight relative to the running estimate.
     p_phys
         Physical depolarising error probability applied to Clifford gates.
+    seed
+        Seed for the compiled sampler's RNG; ``None`` uses OS entropy.
 
     Returns
     -------
     float
         Fraction of shots resulting in a logical failure.
     """
-    beta = kappa2_hz / 50_000.0
-    meas_flip = p_phys / beta
-    circuit = stim.Circuit.generated(
-        "surface_code:rotated_memory_x",
-        distance=3,
-        rounds=N_r,
-        after_clifford_depolarization=p_phys,
-        before_measure_flip_probability=meas_flip,
-    )
-    dem = circuit.detector_error_model(decompose_errors=True)
-    matching = pm.Matching.from_detector_error_model(dem)
-    sampler = circuit.compile_detector_sampler()
-    dets, obs = sampler.sample(shots=shots, separate_observables=True)
-    preds = matching.decode_batch(dets)
-    failures = np.sum(np.any(preds != obs, axis=1))
-    return failures / shots
+    circuit, matching = _build(N_r, kappa2_hz, p_phys)
+    # Pick the failure counter once per call: the memory experiment always
+    # has a single observable, so the flat XOR path applies.
+    count = _count_failures_single if matching.num_fault_ids == 1 else _count_failures
+    n_threads = max(1, min(os.cpu_count() or 1, shots // _BLOCK_SHOTS))
+    samplers = [
+        circuit.compile_detector_sampler(seed=None if seed is None else seed + i)
+        for i in range(n_threads)
+    ]
+    failures = 0
+    total = 0
+    if n_threads == 1:
+        while total < shots:
+            block = min(_BLOCK_SHOTS, shots - total)
+            failures += _sample_block(samplers[0], matching, block, count)
+            total += block
+            eps = failures / total
+            if failures and _wilson_halfwidth(failures, total) < 0.25 * eps:
+                break
+        return failures / total
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        while total < shots:
+            round_shots = min(n_threads * _BLOCK_SHOTS, shots - total)
+            splits = np.array_split(np.arange(round_shots), n_threads)
+            blocks = [len(s) for s in splits if len(s)]
+            counts = pool.map(
+                _sample_block, samplers, itertools.repeat(matching), blocks, itertools.repeat(count)
+            )
+            failures += sum(counts)
+            total += round_shots
+            eps = failures / total
+            if failures and _wilson_halfwidth(failures, total) < 0.25 * eps:
+                break
+    return failures / total
+
 
+def _preload() -> None:
+    """Warm up heavy imports in a freshly spawned worker process.
 
-def run_sweep(N_r_values: Sequence[int], kappa2_kHz: Sequence[float], shots: int) -> pd.DataFrame:
+    With the spawn start method each worker would otherwise pay the Stim,
+    PyMatching and NumPy import cost on its first task; importing them in
+    the initializer keeps the task function pure compute.  Under fork the
+    modules are inherited and the imports are no-ops.
+    """
+    import numpy  # noqa: F401
+    import pymatching  # noqa: F401
+    import stim  # noqa: F401
+
+
+def _sweep_worker(task: tuple[int, float, float, int, int | None]) -> dict:
+    """Evaluate a single grid point in a worker process."""
+    N_r, k2_khz, k2_hz, shots, seed = task
+    eps_log = logical_error_rate(N_r, k2_hz, shots, seed=seed)
+    return {"N_r": N_r, "kappa2_kHz": k2_khz, "eps_log": eps_log}
+
+
+def run_sweep(
+    N_r_values: Sequence[int],
+    kappa2_kHz: Sequence[float],
+    shots: int,
+    seed: int | None = None,
+) -> list[dict]:
     """Evaluate the logical error rate over the parameter grid.
 
+    Grid points are independent, so they are dispatched to a process pool
+    and evaluated in parallel, one worker per available core.
+
     Parameters
     ----------
     N_r_values
@@ -78,18 +250,26 @@ def run_sweep(N_r_values: Sequence[int], kappa2_kHz: Sequence[float], shots: int
         Iterable of cat-pump strengths in kilohertz.
     shots
         Number of circuit samples per grid point.
+    seed
+        Base RNG seed; each grid point gets its own block of derived
+        seeds so the sweep is reproducible while points (and their
+        worker threads) stay independent.  ``None`` seeds from OS
+        entropy.
 
     Returns
     -------
-    pandas.DataFrame
-        Table containing ``N_r``, ``kappa2_kHz`` and ``eps_log`` columns.
+    list of dict
+        Records containing ``N_r``, ``kappa2_kHz`` and ``eps_log`` keys.
     """
-    records = []
-    for N_r in N_r_values:
-        for k2 in kappa2_kHz:
-            eps_log = logical_error_rate(N_r, k2 * 1e3, shots)
-            records.append({"N_r": N_r, "kappa2_kHz": k2, "eps_log": eps_log})
-    return pd.DataFrame.from_records(records)
+    kappa2_hz = np.asarray(kappa2_kHz, dtype=np.float64) * 1e3
+    pairs = list(zip(kappa2_kHz, kappa2_hz))
+    tasks = [
+        (N_r, k2_khz, float(k2_hz), shots, None if seed is None else seed + i * _SEED_STRIDE)
+        for i, (N_r, (k2_khz, k2_hz)) in enumerate(itertools.product(N_r_values, pairs))
+    ]
+    max_workers = min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_preload) as executor:
+        return list(executor.map(_sweep_worker, tasks))
 
 
 def main(argv: Sequence[str] | None = None) -> None:
@@ -106,6 +286,12 @@ def main(argv: Sequence[str] | None = None) -> None:
         action="store_true",
         help="Display the result plot after running the sweep",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Base RNG seed for reproducible sweeps (default: OS entropy)",
+    )
     args = parser.parse_args(argv)
 
     if args.shots <= 0:
@@ -114,26 +300,43 @@ def main(argv: Sequence[str] | None = None) -> None:
     N_r_values = [3, 5, 7]
     kappa2_values = [50.0, 150.0, 300.0]
 
-    df = run_sweep(N_r_values, kappa2_values, args.shots)
+    records = run_sweep(N_r_values, kappa2_values, args.shots, seed=args.seed)
 
     results_dir = Path("results")
     results_dir.mkdir(exist_ok=True)
     csv_path = results_dir / "epsilon_log.csv"
-    df.to_csv(csv_path, index=False)
-
-    fig, ax = plt.subplots()
-    for N_r in N_r_values:
-        sub = df[df["N_r"] == N_r]
-        ax.scatter(sub["kappa2_kHz"], sub["eps_log"], label=f"N_r={N_r}")
-    ax.set_xlabel("kappa2 (kHz)")
-    ax.set_ylabel("eps_log")
-    ax.set_title("Logical error rate sweep")
-    ax.legend()
-    fig.savefig(results_dir / "grid_sweep.png")
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close(fig)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["N_r", "kappa2_kHz", "eps_log"])
+        writer.writeheader()
+        writer.writerows(records)
+
+    if args.show_plot or os.environ.get("WAVEGUIDE_PLOT"):
+        # Matplotlib costs hundreds of ms to import, so only load it when a
+        # figure is actually wanted.
+        import matplotlib
+
+        if not args.show_plot:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots()
+        # Group the records in a single pass instead of rescanning the full
+        # list once per N_r value.
+        groups: dict[int, list[dict]] = {}
+        for record in records:
+            groups.setdefault(record["N_r"], []).append(record)
+        for N_r, sub in groups.items():
+            sub.sort(key=lambda r: r["kappa2_kHz"])
+            ax.scatter([r["kappa2_kHz"] for r in sub], [r["eps_log"] for r in sub], label=f"N_r={N_r}")
+        ax.set_xlabel("kappa2 (kHz)")
+        ax.set_ylabel("eps_log")
+        ax.set_title("Logical error rate sweep")
+        ax.legend()
+        fig.savefig(results_dir / "grid_sweep.png")
+        if args.show_plot:
+            plt.show()
+        else:
+            plt.close(fig)
 
 
 if __name__ == "__main__":
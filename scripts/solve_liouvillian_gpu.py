@@ -10,6 +10,7 @@ import argparse
 from typing import Iterable
 import numpy as np
 import qutip
+from scipy.sparse.linalg import eigs as sp_eigs, eigsh as sp_eigsh
 
 try:
     import qutip.backends.cupy as qbc  # type: ignore
@@ -22,7 +23,28 @@ try:
 except Exception:  # pragma: no cover
     krylov_eigs = None
 
-from qutip.qip.operations.gates import *  # noqa: F401,F403
+try:
+    from numba import njit, prange  # type: ignore
+except Exception:  # pragma: no cover
+    njit = None
+    prange = range
+
+# Names made available to ``--ham`` expressions.  Listed explicitly so the
+# script does not drag in the whole qutip-qip gate catalogue at import time.
+_HAM_NAMES = (
+    "sigmax",
+    "sigmay",
+    "sigmaz",
+    "sigmam",
+    "sigmap",
+    "qeye",
+    "destroy",
+    "create",
+    "num",
+    "tensor",
+    "basis",
+)
+_HAM_GLOBALS = {name: getattr(qutip, name) for name in _HAM_NAMES}
 
 
 def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
@@ -41,20 +63,59 @@ def spectral_density(w: float, A: float, alpha: float, wc: float) -> float:
     return A / (abs(w) ** alpha + wc ** alpha)
 
 
+def spectral_density_vec(w: np.ndarray, A: float, alpha: float, wc: float) -> np.ndarray:
+    """Evaluate the spectral density on a frequency grid."""
+    out = np.empty_like(w)
+    for i in prange(w.shape[0]):
+        out[i] = A / (abs(w[i]) ** alpha + wc ** alpha)
+    return out
+
+
+if njit is not None:  # pragma: no cover
+    spectral_density = njit(cache=True, fastmath=True)(spectral_density)
+    spectral_density_vec = njit(cache=True, fastmath=True, parallel=True)(spectral_density_vec)
+
+
+def spectral_width(H: qutip.Qobj) -> float:
+    """Return the spread ``E_max - E_min`` of the Hamiltonian spectrum.
+
+    Only the two extremal eigenvalues are needed, so for anything beyond
+    a few levels a Lanczos iteration beats the full O(d^3)
+    eigendecomposition that ``eigenenergies`` performs.
+    """
+    if H.shape[0] <= 4:
+        energies = H.eigenenergies()
+        return float(np.max(energies) - np.min(energies))
+    H_s = H.data.as_scipy()
+    emax = sp_eigsh(H_s, k=1, which="LA", return_eigenvectors=False)[0]
+    emin = sp_eigsh(H_s, k=1, which="SA", return_eigenvectors=False)[0]
+    return float(emax - emin)
+
+
 def build_liouvillian(H: qutip.Qobj, A: float, alpha: float, wc: float) -> qutip.Qobj:
     """Construct the TCL-2 Liouvillian with coloured noise."""
-    energies = H.eigenenergies()
-    w0 = float(np.max(energies) - np.min(energies))
+    w0 = spectral_width(H)
     gamma = spectral_density(w0, A, alpha, wc)
     gamma_phi = spectral_density(0.0, A, alpha, wc)
     c_ops = [np.sqrt(gamma) * qutip.sigmam(), np.sqrt(gamma_phi) * qutip.sigmaz()]
     if HAS_GPU:
         H = qbc.to_gpu(H)
         c_ops = [qbc.to_gpu(c) for c in c_ops]
-    L = qutip.liouvillian(H, c_ops)
-    if HAS_GPU:
-        L = qbc.to_gpu(L)
-    return L
+    # liouvillian() of GPU operands already yields a GPU superoperator, so
+    # no further transfer is needed.
+    return qutip.liouvillian(H, c_ops)
+
+
+def _eigvecs_to_qobjs(vecs: np.ndarray, L: qutip.Qobj) -> list[qutip.Qobj]:
+    """Wrap eigenvector columns as operator-ket Qobjs.
+
+    The eigensolvers return Fortran-ordered columns; one transpose up
+    front makes each vector a contiguous row, so the Qobj constructor can
+    adopt it without copying a strided slice.
+    """
+    dims = [[[L.dims[0][0][0]], [L.dims[0][1][0]]], [[1], [1]]]
+    vecs_c = np.ascontiguousarray(vecs.T)
+    return [qutip.Qobj(vecs_c[i], dims=dims, copy=False) for i in range(vecs_c.shape[0])]
 
 
 def dense_eigs(L: qutip.Qobj, k: int) -> tuple[np.ndarray, list[qutip.Qobj]]:
@@ -63,25 +124,40 @@ def dense_eigs(L: qutip.Qobj, k: int) -> tuple[np.ndarray, list[qutip.Qobj]]:
     idx = np.argsort(np.abs(vals))[:k]
     vals = vals[idx]
     vecs = vecs[:, idx]
-    evecs = []
-    dims = [[[L.dims[0][0][0]], [L.dims[0][1][0]]], [[1], [1]]]
-    for i in range(vecs.shape[1]):
-        qv = qutip.Qobj(vecs[:, i], dims=dims)
-        evecs.append(qv)
-    return vals, evecs
+    return vals, _eigvecs_to_qobjs(vecs, L)
+
+
+def sparse_eigs(L: qutip.Qobj, k: int) -> tuple[np.ndarray, list[qutip.Qobj]]:
+    """Compute eigenpairs with ARPACK shift-invert around zero.
+
+    The shift is offset slightly from zero because the Liouvillian always
+    has an exact zero eigenvalue (the steady state), and factorizing
+    ``L - 0*I`` would hit an exactly singular matrix.
+    """
+    L_csc = L.data.as_scipy().tocsc()
+    sigma = 1e-9 * max(1.0, abs(L_csc).max())
+    vals, vecs = sp_eigs(L_csc, k=k, sigma=sigma)
+    return vals, _eigvecs_to_qobjs(vecs, L)
 
 
 def compute_eigs(L: qutip.Qobj, k: int) -> tuple[np.ndarray, list[qutip.Qobj]]:
     """Return ``k`` smallest-magnitude eigenpairs of ``L``."""
     if krylov_eigs is not None:
         return krylov_eigs(L, k=k, sigma=0.0)
-    return dense_eigs(L, k)
+    if L.shape[0] <= k + 2:
+        return dense_eigs(L, k)
+    try:
+        return sparse_eigs(L, k)
+    except Exception:
+        # ARPACK can fail to factorize when the shift sits exactly on an
+        # eigenvalue (the Liouvillian always has 0 in its spectrum).
+        return dense_eigs(L, k)
 
 
 def main(argv: Iterable[str] | None = None) -> None:
     """Run the eigenproblem solver."""
     args = parse_args(argv)
-    H = eval(args.ham)
+    H = eval(args.ham, {"__builtins__": {}}, _HAM_GLOBALS)
     L = build_liouvillian(H, args.A, args.alpha, args.wc)
     vals, vecs = compute_eigs(L, args.num_eval)
     print(f"GPU enabled: {HAS_GPU}")